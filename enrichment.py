@@ -0,0 +1,250 @@
+"""
+Enriquecimento funcional (GO, KEGG Level 2 e COG) de várias amostras contra
+um conjunto de genomas de fundo.
+
+Para cada amostra s e categoria c monta-se a tabela 2x2
+
+                  na categoria     fora da categoria
+    amostra         k[s, c]          n[s] - k[s, c]
+    fundo           K[c]             N - K[c]
+
+e aplica-se o teste exato de Fisher unilateral (super-representação), que é
+a cauda superior da hipergeométrica. Tudo é calculado de uma vez sobre a
+matriz amostras x categorias, com correção de Benjamini-Hochberg por amostra.
+
+    python enrichment.py --amostras g1.xlsx g2.xlsx --fundo ref1.xlsx ref2.xlsx
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.stats import hypergeom
+
+
+# ===================== CONFIG =====================
+COL_GENE = "query"
+COL_GO = "GOs"
+COL_KEGG_KO = "KEGG_ko"
+COL_COG = "COG_category"
+
+# FDR máximo para uma linha entrar na tabela de saída
+ALPHA = 0.05
+
+OBO_FILE = "go.obo"
+# ==================================================
+
+
+# ===================== ESTATÍSTICA =====================
+def fisher_superrepresentacao(k, n, K, N) -> np.ndarray:
+    """
+    P-valor do Fisher unilateral (amostra > fundo) para todas as células.
+    k: (amostras, categorias) | n: (amostras,) | K: (categorias,) | N: escalar
+    """
+    k = np.asarray(k, dtype=np.int64)
+    n = np.broadcast_to(np.asarray(n, dtype=np.int64)[:, None], k.shape)
+    K = np.broadcast_to(np.asarray(K, dtype=np.int64)[None, :], k.shape)
+
+    # k = 0 tem p = 1 exato; a matriz é esparsa, então só calcula o resto
+    p = np.ones(k.shape)
+    mask = k > 0
+    kk, nn, KK = k[mask], n[mask], K[mask]
+    if not kk.size:
+        return p
+
+    # tabelas 2x2 repetidas (mesmo k, n, K) são calculadas uma única vez:
+    # empacota o trio num único inteiro quando cabe em int64
+    base_n, base_K = int(nn.max()) + 1, int(KK.max()) + 1
+    inverso = None
+    if (int(kk.max()) + 1) * base_n * base_K < 2**62:
+        chave = (kk * base_n + nn) * base_K + KK
+        chave, inverso = np.unique(chave, return_inverse=True)
+        kk, resto = np.divmod(chave, base_n * base_K)
+        nn, KK = np.divmod(resto, base_K)
+
+    # população = amostra + fundo; sucessos = na categoria; sorteios = amostra
+    pv = hypergeom.sf(kk - 1, nn + N, kk + KK, nn)
+    p[mask] = pv if inverso is None else pv[inverso.ravel()]
+    return p
+
+
+def fdr_bh(p, axis: int = -1) -> np.ndarray:
+    """
+    q-valores de Benjamini-Hochberg ao longo de `axis` (cada amostra é uma família).
+    NaN marca uma hipótese não testada: fica fora da família e recebe q = NaN.
+    """
+    p = np.moveaxis(np.asarray(p, dtype=float), axis, -1)
+    m = np.sum(~np.isnan(p), axis=-1, keepdims=True)
+    # argsort põe os NaN no fim, depois das hipóteses testadas
+    ordem = np.argsort(p, axis=-1)
+    ordenado = np.take_along_axis(p, ordem, axis=-1) * m / np.arange(1, p.shape[-1] + 1)
+    # mínimo acumulado da direita para a esquerda garante q monotônico
+    # (fmin ignora os NaN do fim)
+    ordenado = np.fmin.accumulate(ordenado[..., ::-1], axis=-1)[..., ::-1]
+    q = np.empty_like(ordenado)
+    np.put_along_axis(q, ordem, np.minimum(ordenado, 1.0), axis=-1)
+    return np.moveaxis(q, -1, axis)
+
+
+def enriquecimento(
+    contagens: pd.DataFrame,
+    totais: pd.Series,
+    fundo: pd.DataFrame,
+    fundo_totais: pd.Series,
+    alpha: float = ALPHA,
+) -> pd.DataFrame:
+    """
+    contagens/fundo: genes por categoria (linhas = genomas, colunas = categorias)
+    totais/fundo_totais: genes anotados no sistema por genoma
+    Retorna uma tabela longa (Sample, Category, ...) com FDR <= alpha.
+    """
+    categorias = contagens.columns.union(fundo.columns)
+    k = contagens.reindex(columns=categorias, fill_value=0).to_numpy()
+    n = totais.reindex(contagens.index).to_numpy()
+    K = fundo.reindex(columns=categorias, fill_value=0).sum(axis=0).to_numpy()
+    N = int(fundo_totais.sum())
+
+    p = fisher_superrepresentacao(k, n, K, N)
+    # a família de cada amostra são só as categorias em que ela tem genes;
+    # assim o FDR não muda conforme as outras planilhas passadas
+    q = fdr_bh(np.where(k > 0, p, np.nan), axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fold = (k / n[:, None]) / (K / N)
+
+    n_amostras, n_cat = k.shape
+    df = pd.DataFrame({
+        "Sample": np.repeat(contagens.index.to_numpy(), n_cat),
+        "Category": np.tile(categorias.to_numpy(), n_amostras),
+        "Count": k.ravel(),
+        "SampleTotal": np.repeat(n, n_cat),
+        "BackgroundCount": np.tile(K, n_amostras),
+        "BackgroundTotal": N,
+        "FoldEnrichment": fold.ravel(),
+        "PValue": p.ravel(),
+        "FDR": q.ravel(),
+    })
+    df = df[(df["FDR"] <= alpha) & (df["Count"] > 0)]
+    return df.sort_values(["Sample", "FDR", "PValue"]).reset_index(drop=True)
+
+
+# ===================== CONTAGEM =====================
+def _genes_por_categoria(pares: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    pares: colunas Sample, Gene, Category (uma linha por termo, pode repetir).
+    Conta cada gene uma vez por categoria e devolve (matriz, genes anotados).
+    """
+    pares = pares.dropna().drop_duplicates()
+    matriz = pares.groupby(["Sample", "Category"]).size().unstack(fill_value=0)
+    totais = pares.groupby("Sample")["Gene"].nunique()
+    return matriz, totais
+
+
+def pick_gene_column(df: pd.DataFrame) -> str:
+    if COL_GENE in df.columns:
+        return COL_GENE
+    # fallback: primeira coluna (muito comum ser o identificador do gene)
+    return df.columns[0]
+
+
+def _explodir(df: pd.DataFrame, coluna: str, padrao: str) -> pd.DataFrame:
+    gene_col = pick_gene_column(df)
+    termos = df[coluna].fillna("").astype(str).str.findall(padrao)
+    out = pd.DataFrame({"Sample": df["Sample"], "Gene": df[gene_col], "Category": termos})
+    return out.explode("Category")
+
+
+def contar_go(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    return _genes_por_categoria(_explodir(df, COL_GO, r"GO:\d{7}"))
+
+
+def contar_cog(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    col = next((c for c in df.columns if isinstance(c, str) and COL_COG in c), None)
+    if col is None:
+        raise KeyError(f"Coluna '{COL_COG}' não encontrada. Colunas disponíveis: {df.columns.tolist()}")
+    return _genes_por_categoria(_explodir(df, col, r"[A-Z]"))
+
+
+def contar_kegg_level2(df: pd.DataFrame, ko_to_level2: dict[str, set[str]]) -> tuple[pd.DataFrame, pd.Series]:
+    pares = _explodir(df, COL_KEGG_KO, r"K\d{5}")
+    # genes anotados = genes com pelo menos um KO válido (como em workflow_KEGG.py)
+    totais = pares.dropna().groupby("Sample")["Gene"].nunique()
+    pares["Category"] = pares["Category"].map(lambda ko: list(ko_to_level2.get(ko, ())))
+    matriz, _ = _genes_por_categoria(pares.explode("Category"))
+    return matriz, totais
+
+
+def ko_para_level2() -> dict[str, set[str]]:
+    from kegg_client import KEGGClient, build_ko_to_level2
+
+    with KEGGClient() as kegg:
+        ko_to_level2, _ = build_ko_to_level2(kegg)
+    return ko_to_level2
+
+
+def nome_amostra(caminho: str) -> str:
+    return os.path.splitext(os.path.basename(caminho))[0]
+
+
+def checar_amostras_unicas(caminhos: list[str]):
+    """Duas planilhas com o mesmo nome de arquivo virariam uma amostra só."""
+    por_nome = {}
+    for c in caminhos:
+        por_nome.setdefault(nome_amostra(c), []).append(c)
+    repetidos = {nome: cs for nome, cs in por_nome.items() if len(cs) > 1}
+    if repetidos:
+        detalhes = "; ".join(f"'{nome}': {', '.join(cs)}" for nome, cs in repetidos.items())
+        raise ValueError(f"Nomes de amostra repetidos (renomeie as planilhas): {detalhes}")
+
+
+def ler_planilha(caminho: str) -> pd.DataFrame:
+    # sem comment="#": um "#" numa Description apagaria o resto da linha
+    df = pd.read_excel(caminho)
+    df["Sample"] = nome_amostra(caminho)
+    return df
+
+
+def ler_planilhas(caminhos: list[str]) -> pd.DataFrame:
+    checar_amostras_unicas(caminhos)
+    return pd.concat([ler_planilha(c) for c in caminhos], ignore_index=True)
+
+
+def anotar_go(tabela: pd.DataFrame, obo_file: str = OBO_FILE) -> pd.DataFrame:
+    """Acrescenta nome e domínio dos termos GO quando o go.obo está disponível."""
+    if not os.path.exists(obo_file):
+        return tabela
+    from goatools.obo_parser import GODag
+
+    go_dag = GODag(obo_file)
+    termos = tabela["Category"]
+    tabela.insert(2, "Name", termos.map(lambda go: go_dag[go].name if go in go_dag else ""))
+    tabela.insert(3, "Namespace", termos.map(lambda go: go_dag[go].namespace if go in go_dag else ""))
+    return tabela
+
+
+# ===================== MAIN =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enriquecimento funcional contra genomas de fundo.")
+    parser.add_argument("--amostras", nargs="+", required=True, help="planilhas do eggNOG-mapper das amostras")
+    parser.add_argument("--fundo", nargs="+", required=True, help="planilhas dos genomas de fundo")
+    parser.add_argument("--sistemas", nargs="+", default=["GO", "KEGG", "COG"], choices=["GO", "KEGG", "COG"])
+    parser.add_argument("--alpha", type=float, default=ALPHA, help="FDR máximo na saída (1 = todas as linhas)")
+    args = parser.parse_args()
+
+    df_amostras = ler_planilhas(args.amostras)
+    df_fundo = ler_planilhas(args.fundo)
+
+    contadores = {"GO": contar_go, "COG": contar_cog}
+    if "KEGG" in args.sistemas:
+        print("Baixando mapeamento KO -> KEGG Level 2...")
+        ko_to_level2 = ko_para_level2()
+        contadores["KEGG"] = lambda df: contar_kegg_level2(df, ko_to_level2)
+
+    saidas = {"GO": "enrichment_GO.tsv", "KEGG": "enrichment_KEGG_Level2.tsv", "COG": "enrichment_COG.tsv"}
+    for sistema in args.sistemas:
+        contagens, totais = contadores[sistema](df_amostras)
+        fundo, fundo_totais = contadores[sistema](df_fundo)
+        tabela = enriquecimento(contagens, totais, fundo, fundo_totais, alpha=args.alpha)
+        if sistema == "GO":
+            tabela = anotar_go(tabela)
+        tabela.to_csv(saidas[sistema], sep="\t", index=False)
+        print(f"{sistema}: {len(tabela)} categorias enriquecidas -> {saidas[sistema]}")
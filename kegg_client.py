@@ -0,0 +1,349 @@
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from collections import defaultdict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# ===================== CONFIG =====================
+# URL base do KEGG REST (pode apontar para o servidor local de fixtures via
+# variável de ambiente, ex: KEGG_BASE_URL=http://127.0.0.1:8765)
+BASE_URL = os.environ.get("KEGG_BASE_URL", "https://rest.kegg.jp")
+
+# O KEGG aceita no máximo 10 entradas por chamada multi-entrada (K1+K2+...)
+BATCH_SIZE = 10
+
+# Limite recomendado pelo KEGG: ~3 requisições por segundo
+MAX_REQ_POR_SEG = 3.0
+
+# Requisições simultâneas (pool de conexões do mesmo tamanho)
+MAX_WORKERS = 3
+
+TIMEOUT = 60
+
+# Respostas que valem nova tentativa (o KEGG responde 403 quando o limite de
+# acesso é excedido)
+RETRY_STATUS = (403, 429, 500, 502, 503, 504)
+
+# Diretório do cache em disco (permite retomar downloads parciais); um
+# subdiretório por servidor, para o servidor local não contaminar o KEGG real.
+# KEGG_CACHE_DIR="" desliga o cache.
+CACHE_DIR = os.environ.get("KEGG_CACHE_DIR", ".kegg_cache")
+# ==================================================
+
+
+class _RateLimiter:
+    """Espaça as requisições para no máximo `rate` por segundo (thread-safe)."""
+
+    def __init__(self, rate: float):
+        self.intervalo = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._proximo = 0.0
+
+    def wait(self):
+        if not self.intervalo:
+            return
+        with self._lock:
+            agora = time.monotonic()
+            espera = self._proximo - agora
+            self._proximo = max(agora, self._proximo) + self.intervalo
+        if espera > 0:
+            time.sleep(espera)
+
+
+def _sem_prefixo(entry_id: str) -> str:
+    """'ko:K00001' -> 'K00001', 'path:map00010' -> 'map00010'."""
+    return entry_id.split(":", 1)[-1].strip()
+
+
+def _lotes(ids: list[str], tamanho: int) -> list[list[str]]:
+    return [ids[i:i + tamanho] for i in range(0, len(ids), tamanho)]
+
+
+class KEGGClient:
+    """
+    Cliente do KEGG REST com:
+    - sessão HTTP reaproveitada (pool de conexões);
+    - retry em 403/429/5xx com backoff exponencial (e Retry-After, se vier);
+    - limite de taxa global entre todas as threads, novas tentativas inclusive;
+    - agrupamento de IDs nas chamadas multi-entrada `list`;
+    - cache em disco por lote, para retomar downloads interrompidos.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        batch_size: int = BATCH_SIZE,
+        max_workers: int = MAX_WORKERS,
+        rate: float = MAX_REQ_POR_SEG,
+        retries: int = 5,
+        backoff: float = 1.0,
+        timeout: float = TIMEOUT,
+        cache_dir: str | None = CACHE_DIR,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.cache_dir = cache_dir
+        self._limiter = _RateLimiter(rate)
+        self._cache_lock = threading.Lock()
+        self._textos = {}
+
+        # o urllib3 só repete falhas de conexão (a requisição não chegou ao
+        # servidor); respostas de erro são repetidas em _request, passando
+        # pelo limite de taxa
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=0,
+            backoff_factor=backoff,
+            allowed_methods=frozenset({"GET"}),
+            respect_retry_after_header=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=max_workers,
+            pool_maxsize=max_workers,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ===================== HTTP =====================
+    def _request(self, path: str) -> requests.Response:
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        tentativa = 0
+        while True:
+            # toda tentativa passa pelo limitador, inclusive as repetições
+            self._limiter.wait()
+            r = self.session.get(url, timeout=self.timeout)
+            if r.status_code not in RETRY_STATUS or tentativa >= self.retries:
+                return r
+            r.close()
+            time.sleep(self._espera(r, tentativa))
+            tentativa += 1
+
+    def _espera(self, r: requests.Response, tentativa: int) -> float:
+        """Backoff exponencial (já na 1ª repetição); Retry-After prevalece se for maior."""
+        espera = self.backoff * 2 ** tentativa
+        retry_after = r.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            espera = max(espera, float(retry_after))
+        return espera
+
+    def get_text(self, path: str) -> str:
+        """Baixa um endpoint (ex: 'link/pathway/ko'); chamadas repetidas vêm da memória."""
+        if path not in self._textos:
+            r = self._request(path)
+            r.raise_for_status()
+            self._textos[path] = r.text
+        return self._textos[path]
+
+    def _get_lote(self, operacao: str, ids: list[str]) -> str:
+        r = self._request(f"{operacao}/{'+'.join(ids)}")
+        # 404 = nenhuma das entradas do lote existe no KEGG
+        if r.status_code == 404:
+            return ""
+        r.raise_for_status()
+        return r.text
+
+    # ===================== CACHE =====================
+    def _cache_path(self, nome: str) -> str | None:
+        if not self.cache_dir:
+            return None
+        host = urlsplit(self.base_url).netloc.replace(":", "_")
+        return os.path.join(self.cache_dir, host, nome.replace("/", "_") + ".jsonl")
+
+    def _cache_load(self, nome: str) -> dict:
+        path = self._cache_path(nome)
+        cache = {}
+        if not path or not os.path.exists(path):
+            return cache
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    reg = json.loads(line)
+                except json.JSONDecodeError:
+                    # última linha truncada de uma execução interrompida
+                    continue
+                cache[reg["id"]] = reg["value"]
+        return cache
+
+    def _cache_append(self, nome: str, resultado: dict):
+        path = self._cache_path(nome)
+        if not path:
+            return
+        with self._cache_lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                for k, v in resultado.items():
+                    f.write(json.dumps({"id": k, "value": v}) + "\n")
+
+    # ===================== BATCH =====================
+    def _fetch(self, operacao: str, ids, parse) -> dict:
+        """
+        Busca `ids` em lotes de `batch_size`, em paralelo, e devolve id -> valor.
+        IDs já presentes no cache em disco não são baixados de novo. IDs que o
+        KEGG não devolveu ficam como None e não vão para o cache, então são
+        tentados de novo na próxima execução.
+        """
+        ids = list(dict.fromkeys(ids))
+        cache = self._cache_load(operacao)
+        faltando = [i for i in ids if i not in cache]
+
+        def worker(lote):
+            resultado = parse(self._get_lote(operacao, lote), lote)
+            self._cache_append(operacao, resultado)
+            return resultado
+
+        if faltando:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for resultado in pool.map(worker, _lotes(faltando, self.batch_size)):
+                    cache.update(resultado)
+
+        return {i: cache.get(i) for i in ids}
+
+    def list_names(self, ids) -> dict[str, str | None]:
+        """`list` multi-entrada: id -> descrição (ex: K00001 -> 'E1.1.1.1, adh; ...')."""
+
+        def parse(txt, lote):
+            por_entry = {_sem_prefixo(i): i for i in lote}
+            out = {}
+            for line in txt.splitlines():
+                if "\t" not in line:
+                    continue
+                left, right = line.split("\t", 1)
+                entry = _sem_prefixo(left)
+                if entry in por_entry:
+                    out[por_entry[entry]] = right.strip()
+            return out
+
+        return self._fetch("list", ids, parse)
+
+
+# ===================== PARSERS =====================
+def parse_brite_br08901(client: KEGGClient) -> tuple[dict[str, str], dict[str, str]]:
+    """
+    Lê a hierarquia KEGG BRITE br08901 (Pathway hierarchy) e retorna:
+    - map_id -> Level2
+    - map_id -> Level1
+    Onde map_id é tipo '00010', '02010', etc.
+    """
+    txt = client.get_text("get/br:br08901")
+    level1 = None
+    level2 = None
+    map_to_l1 = {}
+    map_to_l2 = {}
+
+    for line in txt.splitlines():
+        # Formato típico:
+        # A <level1>
+        # B  <level2>
+        # C   00010 Glycolysis / Gluconeogenesis [PATH:ko00010]
+        if not line:
+            continue
+
+        tag = line[0]
+        if tag == "A":
+            level1 = line[1:].strip()
+        elif tag == "B":
+            level2 = line[1:].strip()
+        elif tag == "C":
+            # tenta capturar o id numérico do mapa
+            parts = line.split()
+            # normalmente: ["C", "00010", "Glycolysis", ...]
+            if len(parts) >= 2 and parts[1].isdigit():
+                map_id = parts[1]
+                if level1 and level2:
+                    map_to_l1[map_id] = level1
+                    map_to_l2[map_id] = level2
+
+    return map_to_l2, map_to_l1
+
+
+def parse_brite_map_names(client: KEGGClient) -> dict[str, str]:
+    """
+    Nomes dos mapas a partir das linhas C do br08901 (map_id -> nome).
+    O texto já está em memória no cliente, então não há nova requisição.
+    """
+    map_names = {}
+    for line in client.get_text("get/br:br08901").splitlines():
+        if not line.startswith("C"):
+            continue
+        parts = line[1:].split(None, 1)
+        if len(parts) == 2 and parts[0].isdigit():
+            # remove o sufixo "[PATH:ko00010]" quando presente
+            map_names[parts[0]] = parts[1].split(" [PATH:")[0].strip()
+    return map_names
+
+
+def build_ko_to_map(client: KEGGClient) -> dict[str, set[str]]:
+    """
+    Usa KEGG REST 'link/pathway/ko' para mapear:
+    KO (Kxxxxx) -> set(map_id)
+    """
+    txt = client.get_text("link/pathway/ko")
+    ko_to_maps = defaultdict(set)
+
+    for line in txt.splitlines():
+        if not line.strip():
+            continue
+        left, right = line.split("\t")
+        # left: ko:K00001
+        # right: path:map00010  (ou path:ko00010 em alguns casos)
+        ko = left.replace("ko:", "").strip()
+        pw = right.replace("path:", "").strip()
+
+        # Extrai o id do mapa:
+        # map00010 -> 00010
+        # ko00010  -> 00010
+        map_id = None
+        if pw.startswith("map") and len(pw) >= 8:
+            map_id = pw[3:8]
+        elif pw.startswith("ko") and len(pw) >= 7:
+            map_id = pw[2:7]
+
+        if map_id and map_id.isdigit():
+            ko_to_maps[ko].add(map_id)
+
+    return ko_to_maps
+
+
+def build_ko_to_level2(client: KEGGClient) -> tuple[dict[str, set[str]], dict[str, str]]:
+    """
+    Combina br08901 e 'link/pathway/ko' e retorna:
+    - KO (Kxxxxx) -> set(Level2)
+    - Level2 -> Level1
+    """
+    map_to_l2, map_to_l1 = parse_brite_br08901(client)
+
+    level2_to_level1 = {}
+    for mid, l2 in map_to_l2.items():
+        l1 = map_to_l1.get(mid)
+        if l2 and l1 and l2 not in level2_to_level1:
+            level2_to_level1[l2] = l1
+
+    ko_to_level2 = {
+        ko: {map_to_l2[m] for m in maps if m in map_to_l2}
+        for ko, maps in build_ko_to_map(client).items()
+    }
+    return ko_to_level2, level2_to_level1
@@ -0,0 +1,215 @@
+"""
+Servidor HTTP local que imita o subconjunto do KEGG REST usado pelo pipeline
+(get/br:br08901, link/pathway/ko e list multi-entrada).
+
+Permite rodar e medir o caminho KEGG inteiro sem rede:
+
+    python kegg_fixture_server.py --port 8765 --n-sinteticos 5000 --latencia 0.05
+    KEGG_CACHE_DIR= KEGG_BASE_URL=http://127.0.0.1:8765 python workflow_KEGG.py planilha.xlsx
+
+(KEGG_CACHE_DIR vazio desliga o cache em disco, para a execução de teste não
+deixar resultados sintéticos no cache usado com o KEGG real.)
+"""
+import argparse
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# ===================== FIXTURES =====================
+# Hierarquia br08901 reduzida (A = Level 1, B = Level 2, C = mapa)
+BRITE = {
+    "Metabolism": {
+        "Carbohydrate metabolism": {
+            "00010": "Glycolysis / Gluconeogenesis",
+            "00020": "Citrate cycle (TCA cycle)",
+        },
+        "Energy metabolism": {
+            "00190": "Oxidative phosphorylation",
+        },
+        "Amino acid metabolism": {
+            "00250": "Alanine, aspartate and glutamate metabolism",
+        },
+    },
+    "Genetic Information Processing": {
+        "Translation": {
+            "03010": "Ribosome",
+        },
+        "Replication and repair": {
+            "03030": "DNA replication",
+        },
+    },
+    "Environmental Information Processing": {
+        "Membrane transport": {
+            "02010": "ABC transporters",
+        },
+        "Signal transduction": {
+            "02020": "Two-component system",
+        },
+    },
+}
+
+KOS = {
+    "K00001": ("E1.1.1.1, adh; alcohol dehydrogenase [EC:1.1.1.1]", ["00010"]),
+    "K00134": ("GAPDH, gapA; glyceraldehyde 3-phosphate dehydrogenase [EC:1.2.1.12]", ["00010"]),
+    "K00844": ("HK; hexokinase [EC:2.7.1.1]", ["00010"]),
+    "K01803": ("TPI, tpiA; triosephosphate isomerase (TIM) [EC:5.3.1.1]", ["00010"]),
+    "K01681": ("ACO, acnA; aconitate hydratase [EC:4.2.1.3]", ["00020"]),
+    "K00330": ("nuoA; NADH-quinone oxidoreductase subunit A [EC:7.1.1.2]", ["00190"]),
+    "K14260": ("alaA; alanine-synthesizing transaminase [EC:2.6.1.-]", ["00250"]),
+    "K02946": ("RP-S10, MRPS10, rpsJ; small subunit ribosomal protein S10", ["03010"]),
+    "K02314": ("dnaB; replicative DNA helicase [EC:5.6.2.3]", ["03030"]),
+    "K02003": ("ABC.CD.A; putative ABC transport system ATP-binding protein", ["02010"]),
+    "K07636": ("phoR; two-component system, OmpR family, phosphate regulon sensor histidine kinase PhoR",
+               ["02020"]),
+}
+
+
+def gerar_sinteticos(n: int, seed: int = 0) -> dict:
+    """Gera `n` KOs extras (K50000, K50001, ...) ligados a mapas aleatórios, para benchmark."""
+    rng = random.Random(seed)
+    mapas = [m for l2 in BRITE.values() for maps in l2.values() for m in maps]
+    return {
+        f"K{50000 + i:05d}": (f"syn{i}; synthetic protein {i}", rng.sample(mapas, rng.randint(1, 3)))
+        for i in range(n)
+    }
+
+
+def _brite_txt() -> str:
+    linhas = ["+C\tMap number", "!"]
+    for l1, l2s in BRITE.items():
+        linhas.append(f"A{l1}")
+        for l2, maps in l2s.items():
+            linhas.append(f"B  {l2}")
+            for mid, nome in maps.items():
+                linhas.append(f"C    {mid}  {nome}")
+    linhas.append("!")
+    return "\n".join(linhas) + "\n"
+
+
+# ===================== HANDLER =====================
+class _KEGGHandler(BaseHTTPRequestHandler):
+    kos: dict = {}
+    map_nomes: dict = {}
+    latencia: float = 0.0
+    taxa_falha: float = 0.0
+    contador = None
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status: int, corpo: str = ""):
+        data = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.contador is not None:
+            self.contador.incrementar()
+        if self.latencia:
+            time.sleep(self.latencia)
+        # simula o bloqueio por excesso de acessos do KEGG
+        if self.taxa_falha and random.random() < self.taxa_falha:
+            return self._responder(403, "Forbidden\n")
+
+        partes = [p for p in self.path.split("?")[0].split("/") if p]
+        corpo = self._despachar(partes)
+        if corpo is None:
+            return self._responder(400, "Bad request\n")
+        if not corpo:
+            return self._responder(404)
+        self._responder(200, corpo)
+
+    def _despachar(self, partes: list[str]) -> str | None:
+        if partes == ["get", "br:br08901"]:
+            return _brite_txt()
+        if partes == ["link", "pathway", "ko"]:
+            return "".join(
+                f"ko:{ko}\tpath:map{mid}\n" for ko, (_, maps) in self.kos.items() for mid in maps
+            )
+        if partes == ["list", "pathway"]:
+            return "".join(f"map{mid}\t{nome}\n" for mid, nome in self.map_nomes.items())
+        if len(partes) == 2 and partes[0] == "list":
+            ids = [i.split(":", 1)[-1] for i in partes[1].split("+")]
+            if len(ids) > 10:
+                return None
+            out = []
+            for i in ids:
+                if i in self.kos:
+                    out.append(f"ko:{i}\t{self.kos[i][0]}\n")
+                elif i.startswith("map") and i[3:] in self.map_nomes:
+                    out.append(f"path:{i}\t{self.map_nomes[i[3:]]}\n")
+            return "".join(out)
+        return None
+
+
+class _Contador:
+    """Número de requisições recebidas e o instante (time.monotonic) de cada uma."""
+
+    def __init__(self):
+        self.valor = 0
+        self.tempos = []
+        self._lock = threading.Lock()
+
+    def incrementar(self):
+        with self._lock:
+            self.valor += 1
+            self.tempos.append(time.monotonic())
+
+
+@contextmanager
+def servidor_kegg(
+    port: int = 0,
+    n_sinteticos: int = 0,
+    latencia: float = 0.0,
+    taxa_falha: float = 0.0,
+):
+    """
+    Sobe o servidor em uma thread e devolve (base_url, contador_de_requisições).
+
+        with servidor_kegg(n_sinteticos=1000) as (url, contador):
+            KEGGClient(base_url=url, rate=0, cache_dir=None).list_names([...])
+    """
+    kos = dict(KOS)
+    kos.update(gerar_sinteticos(n_sinteticos))
+    map_nomes = {mid: nome for l2 in BRITE.values() for maps in l2.values() for mid, nome in maps.items()}
+    contador = _Contador()
+
+    handler = type("Handler", (_KEGGHandler,), {
+        "kos": kos,
+        "map_nomes": map_nomes,
+        "latencia": latencia,
+        "taxa_falha": taxa_falha,
+        "contador": contador,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", contador
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor local que imita o KEGG REST.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--n-sinteticos", type=int, default=0, help="KOs sintéticos extras (benchmark)")
+    parser.add_argument("--latencia", type=float, default=0.0, help="atraso por requisição (s)")
+    parser.add_argument("--taxa-falha", type=float, default=0.0, help="fração de respostas 403")
+    args = parser.parse_args()
+
+    with servidor_kegg(args.port, args.n_sinteticos, args.latencia, args.taxa_falha) as (url, contador):
+        print(f"Servidor KEGG local em {url} (Ctrl+C para parar)")
+        print(f"Use: KEGG_CACHE_DIR= KEGG_BASE_URL={url} python workflow_KEGG.py <planilha.xlsx>")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(f"\n{contador.valor} requisições atendidas.")
@@ -0,0 +1,334 @@
+"""
+Renderização em lote dos gráficos de barras (KEGG Level 2 e GO) para muitas
+amostras.
+
+Cada processo do pool cria a figura de cada tipo UMA vez (backend Agg) e, a
+cada amostra, só atualiza os artistas já existentes (largura/altura e cor das
+barras, textos, rótulos, limites) antes de salvar em todos os formatos.
+
+    python render_batch.py genomas/*.xlsx --saida figuras --formatos svg pdf png
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from matplotlib.lines import Line2D
+
+
+# ===================== CONFIG =====================
+TOP_N_KEGG = 15           # mesmo TOP_N do workflow_KEGG.py
+TOP_N_GO = 6              # microdomínios por domínio (gene_ontology.py)
+GAP_GO = 1.5
+
+FORMATOS = ["svg", "pdf", "png"]
+PNG_DPI = 200
+
+OBO_FILE = "go.obo"
+
+PALETA_PADRAO = [
+    "#0B7285", "#1098AD", "#15AABF", "#22B8CF", "#3BC9DB",
+    "#66D9E8", "#96F2D7", "#63E6BE", "#20C997", "#12B886", "#2F9E44"
+]
+
+DOMINIOS_GO = {
+    "BP": ("biological_process", "Biological Process"),
+    "CC": ("cellular_component", "Cellular Component"),
+    "MF": ("molecular_function", "Molecular Function"),
+}
+# ==================================================
+
+
+def cores_por_level1(level1: list[str], paleta: list[str]) -> dict[str, str]:
+    """
+    Level1 -> cor, na ordem em que cada Level1 aparece (1º grupo = cor 1, ...).
+    O antigo `.tolist().index(l1)` usava a posição da barra e estourava a
+    paleta de 11 cores com TOP_N = 15; aqui grupos distintos só repetem cor
+    se houver mais grupos que cores.
+    """
+    cores = {}
+    for l1 in level1:
+        if l1 not in cores:
+            cores[l1] = paleta[len(cores) % len(paleta)]
+    return cores
+
+
+def cores_go(paleta: list[str]) -> dict[str, str]:
+    """Cores 1, 2 e 3 da paleta para BP, CC e MF (como no gene_ontology.py)."""
+    return {"BP": paleta[0], "CC": paleta[1], "MF": paleta[2]}
+
+
+def _ylim_barras(n: int, altura: float = 0.8, margem: float = 0.05) -> tuple[float, float]:
+    """Limites que o autoscale do matplotlib daria para n barras em 0..n-1."""
+    lo, hi = -altura / 2, n - 1 + altura / 2
+    pad = (hi - lo) * margem
+    return lo - pad, hi + pad
+
+
+def salvar(fig, base: str, formatos=FORMATOS) -> list[str]:
+    """Salva a figura já desenhada em cada formato (base + '.svg', '.pdf', ...)."""
+    saidas = []
+    for fmt in formatos:
+        caminho = f"{base}.{fmt}"
+        fig.savefig(caminho, format=fmt, dpi=PNG_DPI if fmt == "png" else "figure")
+        saidas.append(caminho)
+    return saidas
+
+
+# ===================== TEMPLATES =====================
+class TemplateKEGG:
+    """Barras horizontais de KEGG Level 2 (workflow_KEGG.py), reaproveitáveis."""
+
+    def __init__(self, paleta: list[str], top_n: int = TOP_N_KEGG):
+        self.paleta = list(paleta)
+        self.fig, self.ax = plt.subplots(figsize=(12, 9))
+        ax = self.ax
+
+        pos = np.arange(top_n)
+        self.bars = ax.barh(pos, np.zeros(top_n))
+        # percentagens à direita das barras
+        self.textos = [
+            ax.text(0, y, "", va="center", ha="left", fontsize=9, fontweight="bold", fontfamily="serif")
+            for y in pos
+        ]
+
+        ax.set_xlabel("Percentual de genes anotados com KEGG (%)")
+        ax.set_ylabel("KEGG Level 2")
+        ax.spines["top"].set_visible(False)
+        ax.spines["right"].set_visible(False)
+
+    def desenhar(self, df_plot: pd.DataFrame):
+        """df_plot: colunas Level1, Level2, PercentGenes, já em ordem crescente."""
+        ax = self.ax
+        level1 = df_plot["Level1"].tolist()
+        pct = df_plot["PercentGenes"].to_numpy()
+        cores = cores_por_level1(level1, self.paleta)
+        n = len(pct)
+
+        for i, (bar, txt) in enumerate(zip(self.bars, self.textos)):
+            visivel = i < n
+            bar.set_visible(visivel)
+            txt.set_visible(visivel)
+            if visivel:
+                bar.set_width(pct[i])
+                bar.set_facecolor(cores[level1[i]])
+                txt.set_x(pct[i] + 0.2)
+                txt.set_text(f"{pct[i]:.1f}%")
+
+        ax.set_yticks(np.arange(n), labels=df_plot["Level2"].tolist())
+        ax.set_ylim(*_ylim_barras(n))
+        # folga no eixo X para o texto não ser cortado
+        ax.set_xlim(0, pct.max() * 1.15 if n else 1)
+
+        # a legenda depende do conjunto de Level1; é o único artista recriado
+        handles = [Line2D([0], [0], color=cor, lw=6) for cor in cores.values()]
+        ax.legend(handles, list(cores), title="KEGG Level 1", frameon=False, loc="lower right")
+        self.fig.tight_layout()
+
+
+class TemplateGO:
+    """Barras verticais por domínio GO (gene_ontology.py), reaproveitáveis."""
+
+    def __init__(self, cores_dominios: dict[str, str], top_n: int = TOP_N_GO, gap: float = GAP_GO):
+        self.gap = gap
+        self.fig, self.ax = plt.subplots(figsize=(12, 6))
+        ax = self.ax
+
+        self.bars = {}
+        self.textos = {}
+        self.caixas = {}
+        for dom, (_, titulo) in DOMINIOS_GO.items():
+            self.bars[dom] = ax.bar(np.arange(top_n), np.zeros(top_n), color=cores_dominios[dom])
+            self.textos[dom] = [
+                ax.text(0, 0, "", ha="center", va="bottom", fontsize=8, fontweight="bold", rotation=0)
+                for _ in range(top_n)
+            ]
+            self.caixas[dom] = ax.annotate(
+                titulo,
+                xy=(0, 0),
+                ha="center",
+                va="bottom",
+                fontsize=10,
+                fontweight="bold",
+                bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="black"),
+            )
+
+    def desenhar(self, termos: dict[str, list[tuple[str, int]]]):
+        """termos: BP/CC/MF -> [(nome, contagem), ...] (saída de Counter.most_common)."""
+        ax = self.ax
+        todos = [c for dom in DOMINIOS_GO for _, c in termos.get(dom, [])]
+        total_geral = sum(todos) or 1
+        y_max = max(todos, default=1)
+
+        x0 = 0.0
+        x_fim = 0.0
+        for dom in DOMINIOS_GO:
+            vals = [c for _, c in termos.get(dom, [])]
+            x = np.arange(len(vals)) + x0
+            for i, (bar, txt) in enumerate(zip(self.bars[dom], self.textos[dom])):
+                visivel = i < len(vals)
+                bar.set_visible(visivel)
+                txt.set_visible(visivel)
+                if visivel:
+                    bar.set_x(x[i] - bar.get_width() / 2)
+                    bar.set_height(vals[i])
+                    txt.set_position((x[i], vals[i] + 0.5))
+                    txt.set_text(f"{vals[i] / total_geral * 100:.1f}%")
+
+            caixa = self.caixas[dom]
+            caixa.set_visible(bool(vals))
+            if vals:
+                # domínios em cima
+                # xy e a posição do texto são independentes numa Annotation
+                caixa.xy = ((x[0] + x[-1]) / 2, y_max * 1.05)
+                caixa.set_position(caixa.xy)
+                x_fim = x[-1]
+                x0 = x[-1] + 1 + self.gap
+
+        lo, hi = -0.4, x_fim + 0.4
+        pad = (hi - lo) * 0.05
+        ax.set_xlim(lo - pad, hi + pad)
+        # folga no eixo Y para o texto não cortar
+        ax.set_ylim(0, y_max * 1.2)
+        self.fig.tight_layout()
+
+
+# ===================== DADOS =====================
+def preparar_kegg(
+    df: pd.DataFrame,
+    ko_to_level2: dict[str, set[str]],
+    level2_to_level1: dict[str, str],
+    top_n: int = TOP_N_KEGG,
+) -> dict[str, pd.DataFrame]:
+    """Amostra -> df_plot no formato do workflow_KEGG.py (top_n Level2, ordem crescente)."""
+    from enrichment import contar_kegg_level2
+
+    matriz, totais = contar_kegg_level2(df, ko_to_level2)
+    pct = matriz.div(totais.reindex(matriz.index), axis=0) * 100
+
+    saida = {}
+    for amostra, linha in pct.iterrows():
+        linha = linha[linha > 0].sort_values(ascending=False).head(top_n).sort_values()
+        saida[amostra] = pd.DataFrame({
+            "Level1": [level2_to_level1.get(l2, "Other") for l2 in linha.index],
+            "Level2": linha.index,
+            "CountGenes": matriz.loc[amostra, linha.index].to_numpy(),
+            "PercentGenes": linha.to_numpy(),
+        })
+    return saida
+
+
+def preparar_go(df: pd.DataFrame, go_dag, top_n: int = TOP_N_GO) -> dict[str, dict[str, list]]:
+    """Amostra -> {BP/CC/MF: [(nome, contagem), ...]} como em gene_ontology.py."""
+    from enrichment import contar_go
+
+    matriz, _ = contar_go(df)
+    ids = [go for go in matriz.columns if go in go_dag]
+    nomes = pd.Series([go_dag[go].name for go in ids], index=ids)
+    namespaces = pd.Series([go_dag[go].namespace for go in ids], index=ids)
+    matriz = matriz[ids]
+
+    saida = {amostra: {} for amostra in matriz.index}
+    for dom, (namespace, _) in DOMINIOS_GO.items():
+        cols = namespaces.index[namespaces == namespace]
+        # ids alternativos apontam para o mesmo termo: soma pelo nome
+        por_nome = matriz[cols].T.groupby(nomes[cols].to_numpy()).sum().T
+        for amostra, linha in por_nome.iterrows():
+            top = linha[linha > 0].sort_values(ascending=False, kind="stable").head(top_n)
+            saida[amostra][dom] = list(zip(top.index, top.astype(int)))
+    return saida
+
+
+# ===================== WORKERS =====================
+_TEMPLATES = {}
+_CONFIG = {}
+
+
+def _init_worker(paleta: list[str], formatos: list[str]):
+    matplotlib.use("Agg")
+    _CONFIG["paleta"] = paleta
+    _CONFIG["formatos"] = formatos
+
+
+def _template(tipo: str):
+    if tipo not in _TEMPLATES:
+        if tipo == "KEGG":
+            _TEMPLATES[tipo] = TemplateKEGG(_CONFIG["paleta"])
+        else:
+            _TEMPLATES[tipo] = TemplateGO(cores_go(_CONFIG["paleta"]))
+    return _TEMPLATES[tipo]
+
+
+def _renderizar(tarefa: tuple) -> list[str]:
+    tipo, dados, base = tarefa
+    template = _template(tipo)
+    template.desenhar(dados)
+    return salvar(template.fig, base, _CONFIG["formatos"])
+
+
+def renderizar_lote(
+    tarefas: list[tuple],
+    paleta: list[str] = PALETA_PADRAO,
+    formatos: list[str] = FORMATOS,
+    processos: int | None = None,
+) -> list[str]:
+    """
+    tarefas: (tipo, dados, caminho_base) com tipo 'KEGG' ou 'GO'.
+    Distribui as tarefas entre processos; cada um reaproveita seus templates.
+    """
+    processos = processos or os.cpu_count() or 1
+    chunksize = max(1, len(tarefas) // (processos * 4))
+    with ProcessPoolExecutor(processos, initializer=_init_worker, initargs=(paleta, formatos)) as pool:
+        return [p for saidas in pool.map(_renderizar, tarefas, chunksize=chunksize) for p in saidas]
+
+
+# ===================== MAIN =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera os gráficos KEGG/GO de várias planilhas em paralelo.")
+    parser.add_argument("planilhas", nargs="+", help="planilhas do eggNOG-mapper (.xlsx), uma por amostra")
+    parser.add_argument("--saida", default="figuras", help="diretório de saída")
+    parser.add_argument("--formatos", nargs="+", default=FORMATOS, choices=["svg", "pdf", "png"])
+    parser.add_argument("--graficos", nargs="+", default=["KEGG", "GO"], choices=["KEGG", "GO"])
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--cores", nargs="+", default=PALETA_PADRAO, help="paleta (11 hexadecimais)")
+    args = parser.parse_args()
+
+    from enrichment import checar_amostras_unicas, ler_planilha
+
+    # o nome da amostra vem do arquivo: nomes repetidos sobrescreveriam as figuras
+    try:
+        checar_amostras_unicas(args.planilhas)
+    except ValueError as e:
+        parser.error(str(e))
+
+    matplotlib.use("Agg")
+    os.makedirs(args.saida, exist_ok=True)
+
+    # a leitura dos .xlsx também é distribuída entre os processos
+    with ProcessPoolExecutor(args.processos) as pool:
+        df = pd.concat(pool.map(ler_planilha, args.planilhas), ignore_index=True)
+
+    tarefas = []
+    if "KEGG" in args.graficos:
+        from kegg_client import KEGGClient, build_ko_to_level2
+
+        print("Baixando hierarquia KEGG...")
+        with KEGGClient() as kegg:
+            ko_to_level2, level2_to_level1 = build_ko_to_level2(kegg)
+        for amostra, df_plot in preparar_kegg(df, ko_to_level2, level2_to_level1).items():
+            if not df_plot.empty:
+                tarefas.append(("KEGG", df_plot, os.path.join(args.saida, f"{amostra}_KEGG_Level2_barh")))
+
+    if "GO" in args.graficos:
+        from goatools.obo_parser import GODag
+
+        go_dag = GODag(OBO_FILE)
+        for amostra, termos in preparar_go(df, go_dag).items():
+            tarefas.append(("GO", termos, os.path.join(args.saida, f"{amostra}_GO_domains_vertical")))
+
+    print(f"Renderizando {len(tarefas)} gráficos em {args.formatos}...")
+    saidas = renderizar_lote(tarefas, args.cores, args.formatos, args.processos)
+    print(f"✅ {len(saidas)} arquivos gerados em {args.saida}/")
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import false_discovery_control, fisher_exact
+
+from enrichment import (
+    contar_cog,
+    contar_go,
+    enriquecimento,
+    fdr_bh,
+    fisher_superrepresentacao,
+    ler_planilha,
+    ler_planilhas,
+)
+
+
+def _fisher_ref(k, n, K, N) -> float:
+    return fisher_exact([[k, n - k], [K, N - K]], alternative="greater").pvalue
+
+
+def test_fisher_igual_ao_scipy():
+    rng = np.random.default_rng(0)
+    k = rng.integers(0, 30, (4, 25))
+    n = k.sum(axis=1) + 50
+    K = rng.integers(0, 200, 25)
+    N = int(K.sum()) + 500
+
+    p = fisher_superrepresentacao(k, n, K, N)
+    ref = [[_fisher_ref(k[s, c], n[s], K[c], N) for c in range(25)] for s in range(4)]
+    np.testing.assert_allclose(p, ref, rtol=1e-10)
+
+
+def test_fisher_tabelas_repetidas_empacotadas():
+    # a mesma tabela 2x2 em várias células deve dar o mesmo p-valor em todas
+    k = np.array([[3, 3, 0, 5], [3, 5, 3, 0]])
+    n = np.array([40, 40])
+    K = np.array([10, 10, 10, 2])
+    N = 400
+
+    p = fisher_superrepresentacao(k, n, K, N)
+    assert p[0, 0] == p[0, 1] == p[1, 0] == p[1, 2]
+    assert p[0, 2] == p[1, 3] == 1.0
+    assert p[0, 0] == pytest.approx(_fisher_ref(3, 40, 10, N), rel=1e-10)
+    assert p[0, 3] == pytest.approx(_fisher_ref(5, 40, 2, N), rel=1e-10)
+    assert p[1, 1] == pytest.approx(_fisher_ref(5, 40, 10, N), rel=1e-10)
+
+
+def test_fisher_sem_empacotar_quando_a_chave_estoura_int64():
+    k = np.array([[2_000_000, 1]])
+    n = np.array([3_000_000])
+    K = np.array([3_000_000, 5])
+    N = 9_000_000
+
+    p = fisher_superrepresentacao(k, n, K, N)
+    assert p[0, 1] == pytest.approx(_fisher_ref(1, 3_000_000, 5, N), rel=1e-10)
+    assert 0.0 <= p[0, 0] <= 1.0
+
+
+def test_fdr_bh_igual_ao_scipy():
+    p = np.random.default_rng(1).random((3, 50)) ** 3
+    q = fdr_bh(p, axis=1)
+    for linha, q_linha in zip(p, q):
+        np.testing.assert_allclose(q_linha, false_discovery_control(linha))
+    np.testing.assert_allclose(fdr_bh(p.T, axis=0).T, q)
+
+
+def test_fdr_bh_ignora_nao_testadas():
+    p = np.array([0.001, np.nan, 0.02, np.nan, 0.04])
+    q = fdr_bh(p)
+    np.testing.assert_allclose(q[[0, 2, 4]], false_discovery_control(p[[0, 2, 4]]))
+    assert np.isnan(q[[1, 3]]).all()
+
+
+def test_fdr_nao_depende_das_outras_amostras():
+    fundo = pd.DataFrame([[2, 3, 40]], columns=["c0", "c1", "c2"])
+    fundo_totais = pd.Series([200])
+    a = pd.DataFrame([[15, 1, 0]], index=["A"], columns=["c0", "c1", "c2"])
+    totais = pd.Series([30], index=["A"])
+
+    sozinha = enriquecimento(a, totais, fundo, fundo_totais, alpha=1)
+
+    # uma amostra sem relação, com 50 categorias próprias
+    extra = pd.DataFrame([[1] * 50], index=["B"], columns=[f"x{i}" for i in range(50)])
+    juntas = enriquecimento(
+        pd.concat([a, extra]).fillna(0).astype(int),
+        pd.concat([totais, pd.Series([60], index=["B"])]),
+        fundo,
+        fundo_totais,
+        alpha=1,
+    )
+    pd.testing.assert_frame_equal(sozinha, juntas[juntas["Sample"] == "A"].reset_index(drop=True))
+
+
+def test_ler_planilha_preserva_hash(tmp_path):
+    caminho = tmp_path / "amostra.xlsx"
+    pd.DataFrame({
+        "#query": ["g1", "g2"],
+        "Description": ["Subunit #2 of complex", "-"],
+        "GOs": ["GO:0008150,GO:0003674", "GO:0005575"],
+    }).to_excel(caminho, index=False)
+
+    df = ler_planilha(str(caminho))
+    assert df["GOs"].tolist() == ["GO:0008150,GO:0003674", "GO:0005575"]
+
+    matriz, totais = contar_go(df)
+    assert totais["amostra"] == 2
+    assert matriz.loc["amostra", "GO:0003674"] == 1
+
+
+def test_contar_cog_sem_coluna():
+    df = pd.DataFrame({"query": ["g1"], "GOs": ["GO:0008150"], "Sample": ["a"]})
+    with pytest.raises(KeyError, match="COG_category"):
+        contar_cog(df)
+
+
+def test_ler_planilhas_rejeita_nomes_repetidos(tmp_path):
+    caminhos = []
+    for pasta in ("a", "b"):
+        (tmp_path / pasta).mkdir()
+        caminho = tmp_path / pasta / "genome.xlsx"
+        pd.DataFrame({"query": ["g1"], "GOs": ["GO:0008150"]}).to_excel(caminho, index=False)
+        caminhos.append(str(caminho))
+
+    with pytest.raises(ValueError, match="genome"):
+        ler_planilhas(caminhos)
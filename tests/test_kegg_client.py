@@ -0,0 +1,119 @@
+import os
+import random
+
+import numpy as np
+
+import pytest
+
+from kegg_client import (
+    KEGGClient,
+    build_ko_to_level2,
+    build_ko_to_map,
+    parse_brite_br08901,
+    parse_brite_map_names,
+)
+from kegg_fixture_server import servidor_kegg
+
+
+def _ids(n: int) -> list[str]:
+    return [f"K{50000 + i:05d}" for i in range(n)]
+
+
+@pytest.fixture
+def servidor():
+    with servidor_kegg(n_sinteticos=200) as (url, contador):
+        yield url, contador
+
+
+def test_list_names_agrupa_em_lotes_de_10(servidor):
+    url, contador = servidor
+    with KEGGClient(base_url=url, rate=0, cache_dir=None) as kegg:
+        nomes = kegg.list_names(_ids(97))
+
+    assert contador.valor == 10
+    assert nomes["K50008"] == "syn8; synthetic protein 8"
+    assert all(nomes.values())
+
+
+def test_retry_em_403():
+    random.seed(0)
+    with servidor_kegg(n_sinteticos=100, taxa_falha=0.5) as (url, contador):
+        with KEGGClient(base_url=url, rate=0, retries=20, backoff=0, cache_dir=None) as kegg:
+            nomes = kegg.list_names(_ids(100))
+
+    assert all(nomes.values())
+    # 10 lotes; as respostas 403 forçaram requisições extras
+    assert contador.valor > 10
+
+
+def test_limite_de_taxa_vale_para_as_repeticoes():
+    random.seed(1)
+    rate = 20.0
+    with servidor_kegg(n_sinteticos=60, taxa_falha=0.4) as (url, contador):
+        with KEGGClient(base_url=url, rate=rate, retries=20, backoff=0.01, cache_dir=None) as kegg:
+            nomes = kegg.list_names(_ids(60))
+
+    assert all(nomes.values())
+    assert contador.valor > 6  # houve repetições
+    # os instantes são tomados no servidor; a folga cobre só o jitter local
+    assert np.diff(sorted(contador.tempos)).min() >= 1 / rate - 0.005
+
+
+def test_retoma_de_cache_truncado(servidor, tmp_path):
+    url, contador = servidor
+    with KEGGClient(base_url=url, rate=0, cache_dir=str(tmp_path)) as kegg:
+        esperado = kegg.list_names(_ids(30))
+    assert contador.valor == 3
+
+    # simula uma execução interrompida no meio da escrita da última linha
+    (arquivo,) = [os.path.join(d, f) for d, _, fs in os.walk(tmp_path) for f in fs]
+    with open(arquivo, encoding="utf-8") as f:
+        conteudo = f.read()
+    with open(arquivo, "w", encoding="utf-8") as f:
+        f.write(conteudo[:-15])
+
+    with KEGGClient(base_url=url, rate=0, cache_dir=str(tmp_path)) as kegg:
+        assert kegg.list_names(_ids(30)) == esperado
+    # só o lote com o ID perdido é baixado de novo
+    assert contador.valor == 4
+
+
+def test_ids_ausentes_nao_vao_para_o_cache(servidor, tmp_path):
+    url, contador = servidor
+    for _ in range(2):
+        with KEGGClient(base_url=url, rate=0, cache_dir=str(tmp_path)) as kegg:
+            assert kegg.list_names(["K00001", "K99999"]) == {
+                "K00001": "E1.1.1.1, adh; alcohol dehydrogenase [EC:1.1.1.1]",
+                "K99999": None,
+            }
+    # K99999 é pedido de novo na segunda execução
+    assert contador.valor == 2
+
+
+def test_cache_separado_por_servidor(servidor, tmp_path):
+    url, _ = servidor
+    with KEGGClient(base_url=url, rate=0, cache_dir=str(tmp_path)) as kegg:
+        kegg.list_names(["K00001"])
+
+    with servidor_kegg() as (outro_url, outro_contador):
+        with KEGGClient(base_url=outro_url, rate=0, cache_dir=str(tmp_path)) as kegg:
+            kegg.list_names(["K00001"])
+    assert outro_contador.valor == 1
+
+
+def test_parsers(servidor):
+    url, contador = servidor
+    with KEGGClient(base_url=url, rate=0, cache_dir=None) as kegg:
+        map_to_l2, map_to_l1 = parse_brite_br08901(kegg)
+        map_names = parse_brite_map_names(kegg)
+        ko_to_maps = build_ko_to_map(kegg)
+        ko_to_level2, level2_to_level1 = build_ko_to_level2(kegg)
+
+    assert map_to_l2["00010"] == "Carbohydrate metabolism"
+    assert map_to_l1["03010"] == "Genetic Information Processing"
+    assert map_names["00020"] == "Citrate cycle (TCA cycle)"
+    assert ko_to_maps["K00001"] == {"00010"}
+    assert ko_to_level2["K02946"] == {"Translation"}
+    assert level2_to_level1["Membrane transport"] == "Environmental Information Processing"
+    # br08901 e link/pathway/ko são baixados uma única vez cada
+    assert contador.valor == 2
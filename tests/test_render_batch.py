@@ -0,0 +1,59 @@
+import matplotlib
+
+matplotlib.use("Agg")
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+import pytest
+
+from render_batch import PALETA_PADRAO, TemplateGO, TemplateKEGG, cores_go, cores_por_level1
+
+
+def _pixels(template) -> np.ndarray:
+    template.fig.canvas.draw()
+    return np.asarray(template.fig.canvas.buffer_rgba()).copy()
+
+
+def _df_kegg(n: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Level1": [f"Grupo {i % 4}" for i in range(n)],
+        "Level2": [f"Categoria {seed}-{i}" for i in range(n)],
+        "PercentGenes": np.sort(rng.uniform(1, 60, n)),
+    })
+
+
+def _termos_go(n: int, seed: int) -> dict:
+    rng = np.random.default_rng(seed)
+    return {
+        dom: [(f"{dom} termo {i}", int(c)) for i, c in enumerate(sorted(rng.integers(1, 90, n), reverse=True))]
+        for dom in ("BP", "CC", "MF")
+    }
+
+
+@pytest.mark.parametrize(
+    "criar, grande, pequeno",
+    [
+        (lambda: TemplateKEGG(PALETA_PADRAO), _df_kegg(15, 0), _df_kegg(4, 1)),
+        (lambda: TemplateGO(cores_go(PALETA_PADRAO)), _termos_go(6, 0), _termos_go(2, 1)),
+    ],
+)
+def test_template_reaproveitado_igual_a_novo(criar, grande, pequeno):
+    reusado = criar()
+    reusado.desenhar(grande)
+    reusado.desenhar(pequeno)
+
+    novo = criar()
+    novo.desenhar(pequeno)
+
+    np.testing.assert_array_equal(_pixels(reusado), _pixels(novo))
+    plt.close("all")
+
+
+def test_cores_por_level1_distintas():
+    # 15 barras (TOP_N) com 11 grupos: grupos diferentes nunca dividem cor
+    level1 = ["A", "A", "A", "A"] + [f"B{i}" for i in range(10)] + ["A"]
+    cores = cores_por_level1(level1, PALETA_PADRAO)
+    assert len(cores) == 11
+    assert list(cores.values()) == PALETA_PADRAO
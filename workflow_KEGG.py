@@ -2,10 +2,10 @@ import os
 import subprocess
 import sys
 import pandas as pd
-import requests
 from collections import defaultdict, Counter
 import matplotlib.pyplot as plt
-from matplotlib.lines import Line2D
+from kegg_client import KEGGClient, build_ko_to_map, parse_brite_br08901, parse_brite_map_names
+from render_batch import TemplateKEGG, salvar
 
 
 # ===================== CONFIG =====================
@@ -25,8 +25,12 @@ COL_GENE = "query"          # geralmente é "query" no eggNOG
 # Passo 7: top 10–20 mais abundantes
 TOP_N = 15
 
-# Passo 8: saída do gráfico
+# Passo 8: saída do gráfico (um arquivo por formato, ex: ["svg", "pdf", "png"])
 OUT_SVG = "KEGG_Level2_barh.svg"
+FORMATOS = ["svg"]
+
+# Tabela KO -> nome, mapas e nomes dos mapas (via chamadas multi-entrada do KEGG)
+OUT_KO_TSV = "KEGG_KO_annotation.tsv"
 # ==================================================
 
 # Paleta pastel (Level 1 -> cor)
@@ -54,79 +58,9 @@ def escolher_excel_macos() -> str | None:
     except subprocess.CalledProcessError:
         return None
 
-def get_text(url: str) -> str:
-    r = requests.get(url, timeout=60)
-    r.raise_for_status()
-    return r.text
+# Cliente único: sessão reaproveitada, retry/backoff, limite de taxa e cache em disco
+KEGG = KEGGClient()
 
-def parse_brite_br08901() -> tuple[dict[str, str], dict[str, str]]:
-    """
-    Lê a hierarquia KEGG BRITE br08901 (Pathway hierarchy) e retorna:
-    - map_id -> Level2
-    - map_id -> Level1
-    Onde map_id é tipo '00010', '02010', etc.
-    """
-    txt = get_text("https://rest.kegg.jp/get/br:br08901")
-    level1 = None
-    level2 = None
-    map_to_l1 = {}
-    map_to_l2 = {}
-
-    for line in txt.splitlines():
-        # Formato típico:
-        # A <level1>
-        # B  <level2>
-        # C   00010 Glycolysis / Gluconeogenesis [PATH:ko00010]
-        if not line:
-            continue
-
-        tag = line[0]
-        if tag == "A":
-            level1 = line[1:].strip()
-        elif tag == "B":
-            level2 = line[1:].strip()
-        elif tag == "C":
-            # tenta capturar o id numérico do mapa
-            parts = line.split()
-            # normalmente: ["C", "00010", "Glycolysis", ...]
-            if len(parts) >= 2 and parts[1].isdigit():
-                map_id = parts[1]
-                if level1 and level2:
-                    map_to_l1[map_id] = level1
-                    map_to_l2[map_id] = level2
-
-    return map_to_l2, map_to_l1
-
-def build_ko_to_map() -> dict[str, set[str]]:
-    """
-    Usa KEGG REST 'link/pathway/ko' para mapear:
-    KO (Kxxxxx) -> set(map_id)
-    """
-    txt = get_text("https://rest.kegg.jp/link/pathway/ko")
-    ko_to_maps = defaultdict(set)
-
-    for line in txt.splitlines():
-        if not line.strip():
-            continue
-        left, right = line.split("\t")
-        # left: ko:K00001
-        # right: path:map00010  (ou path:ko00010 em alguns casos)
-        ko = left.replace("ko:", "").strip()
-        pw = right.replace("path:", "").strip()
-
-        # Extrai o id do mapa:
-        # map00010 -> 00010
-        # ko00010  -> 00010
-        map_id = None
-        if pw.startswith("map") and len(pw) >= 8:
-            map_id = pw[3:8]
-        elif pw.startswith("ko") and len(pw) >= 7:
-            map_id = pw[2:7]
-
-        if map_id and map_id.isdigit():
-            ko_to_maps[ko].add(map_id)
-
-    return ko_to_maps
 
 def pick_gene_column(df: pd.DataFrame) -> str:
     if COL_GENE in df.columns:
@@ -199,7 +133,7 @@ if df_kegg.empty:
 
 # ===================== DOWNLOAD MAPS =====================
 print("Baixando hierarquia KEGG (br08901)...")
-map_to_l2, map_to_l1 = parse_brite_br08901()
+map_to_l2, map_to_l1 = parse_brite_br08901(KEGG)
 
 # índice direto Level2 -> Level1 (Passo 5)
 level2_to_level1 = {}
@@ -209,7 +143,28 @@ for mid, l2 in map_to_l2.items():
         level2_to_level1[l2] = l1
 
 print("Baixando mapeamento KO -> pathway maps...")
-ko_to_maps = build_ko_to_map()
+ko_to_maps = build_ko_to_map(KEGG)
+
+print("Baixando nomes dos KOs (lotes de 10 por requisição)...")
+kos_unicos = sorted(df_kegg[COL_KEGG_KO].unique())
+ko_names = KEGG.list_names(kos_unicos)
+map_names = parse_brite_map_names(KEGG)
+
+ko_rows = []
+for ko in kos_unicos:
+    maps = sorted(ko_to_maps.get(ko, []))
+    ko_rows.append((
+        ko,
+        ko_names.get(ko) or "",
+        ",".join(f"map{m}" for m in maps),
+        "; ".join(map_names.get(m, "") for m in maps),
+    ))
+pd.DataFrame(ko_rows, columns=["KO", "Name", "Pathways", "PathwayNames"]).to_csv(
+    OUT_KO_TSV, sep="\t", index=False
+)
+print(f"Tabela de KOs gerada: {OUT_KO_TSV}")
+# nada mais é baixado daqui em diante
+KEGG.close()
 
 # ===================== GENE-LEVEL COUNT =====================
 # Queremos: para cada gene, quais Level2 ele atinge (via qualquer KO), e contar genes por Level2 (sem duplicar)
@@ -252,63 +207,8 @@ df_plot = df_plot.sort_values("PercentGenes", ascending=False).head(TOP_N)
 df_plot = df_plot.sort_values("PercentGenes", ascending=True)
 
 # ===================== PLOT (Passo 8: barras horizontais) =====================
-bar_colors = [
-    paleta_usuario[df_plot["Level1"].tolist().index(l1)] if l1 in df_plot["Level1"].tolist() else "#e2ece9"
-    for l1 in df_plot["Level1"]
-]
-
-plt.figure(figsize=(12, 9)) # Aumentei um pouco a largura para caber o texto lateral
-
-# Cria as barras
-bars = plt.barh(
-    df_plot["Level2"],
-    df_plot["PercentGenes"],
-    color=bar_colors
-)
-
-# --- ADICIONAR PERCENTAGENS À DIREITA DAS BARRAS ---
-for bar in bars:
-    width = bar.get_width()
-    plt.text(
-        width + 0.2,                # Posição X: um pouco depois do fim da barra
-        bar.get_y() + bar.get_height()/2, # Posição Y: centro vertical da barra
-        f'{width:.1f}%',            # O valor da percentagem formatado
-        va='center',                # Alinhamento vertical ao centro
-        ha='left',                  # Alinhamento horizontal à esquerda do ponto X
-        fontsize=9, 
-        fontweight='bold',
-        fontfamily='serif'          # Mantendo a estética de jornal
-    )
-
-plt.xlabel("Percentual de genes anotados com KEGG (%)")
-plt.ylabel("KEGG Level 2")
-
-# Ajuste do limite do eixo X para o texto não ser cortado
-plt.xlim(0, df_plot["PercentGenes"].max() * 1.15)
-
-# estilo clean
-ax = plt.gca()
-ax.spines["top"].set_visible(False)
-ax.spines["right"].set_visible(False)
-
-
-# legenda KEGG Level 1
-from matplotlib.lines import Line2D
-
-unique_l1 = list(dict.fromkeys(df_plot["Level1"].tolist()))
-handles = [
-    Line2D([0], [0], color=paleta_usuario[df_plot["Level1"].tolist().index(l1)] if l1 in df_plot["Level1"].tolist() else "#e2ece9", lw=6)
-    for l1 in unique_l1
-]
-
-plt.legend(
-    handles,
-    unique_l1,
-    title="KEGG Level 1",
-    frameon=False,
-    loc="lower right"
-)
-
-plt.tight_layout()
-plt.savefig(OUT_SVG, format="svg")
-plt.close()
+# Mesmo template usado na renderização em lote (render_batch.py)
+template = TemplateKEGG(paleta_usuario, top_n=TOP_N)
+template.desenhar(df_plot)
+salvar(template.fig, os.path.splitext(OUT_SVG)[0], FORMATOS)
+plt.close(template.fig)